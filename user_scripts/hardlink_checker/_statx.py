@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+statx(2) wrapper
+
+Minimal ctypes binding for the Linux statx() system call. The hardlink
+checker only needs a file's link count, size, inode and modification time,
+so this requests just those fields and passes AT_STATX_DONT_SYNC to avoid
+forcing a metadata sync on FUSE (shfs) and network filesystems.
+
+Author: OlickQC
+License: MIT
+"""
+
+import os
+import ctypes
+from typing import NamedTuple, Optional, Union
+
+
+AT_FDCWD = -100
+AT_SYMLINK_NOFOLLOW = 0x100
+AT_STATX_DONT_SYNC = 0x4000
+
+STATX_NLINK = 0x0004
+STATX_MTIME = 0x0040
+STATX_INO = 0x0100
+STATX_SIZE = 0x0200
+
+STATX_FLAGS = AT_SYMLINK_NOFOLLOW | AT_STATX_DONT_SYNC
+STATX_MASK = STATX_NLINK | STATX_SIZE | STATX_INO | STATX_MTIME
+
+
+class _StatxTimestamp(ctypes.Structure):
+    """struct statx_timestamp from <linux/stat.h>."""
+
+    _fields_ = [
+        ("tv_sec", ctypes.c_int64),
+        ("tv_nsec", ctypes.c_uint32),
+        ("__reserved", ctypes.c_int32),
+    ]
+
+
+class _Statx(ctypes.Structure):
+    """struct statx from <linux/stat.h> (256 bytes)."""
+
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32),
+        ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32),
+        ("stx_uid", ctypes.c_uint32),
+        ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16),
+        ("__spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64),
+        ("stx_size", ctypes.c_uint64),
+        ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _StatxTimestamp),
+        ("stx_btime", _StatxTimestamp),
+        ("stx_ctime", _StatxTimestamp),
+        ("stx_mtime", _StatxTimestamp),
+        ("stx_rdev_major", ctypes.c_uint32),
+        ("stx_rdev_minor", ctypes.c_uint32),
+        ("stx_dev_major", ctypes.c_uint32),
+        ("stx_dev_minor", ctypes.c_uint32),
+        ("__spare2", ctypes.c_uint64 * 14),
+    ]
+
+
+class StatxResult(NamedTuple):
+    """Subset of os.stat_result populated from statx()."""
+
+    st_nlink: int
+    st_size: int
+    st_ino: int
+    st_mtime: float
+    st_dev: int
+
+
+# Resolved lazily by available(): None until probed, then True/False
+_HAVE_STATX: Optional[bool] = None
+_libc_statx = None
+
+
+def available() -> bool:
+    """
+    Check whether statx() can be used on this system.
+
+    The first call loads libc and probes the syscall once; the outcome is
+    cached so later calls are free. Non-Linux systems, glibc older than 2.28,
+    kernels older than 4.11 and sandboxes that block the syscall all report
+    False.
+
+    Returns:
+        True if statx() is usable, False otherwise
+    """
+    global _HAVE_STATX, _libc_statx
+
+    if _HAVE_STATX is None:
+        try:
+            libc = ctypes.CDLL("libc.so.6", use_errno=True)
+            func = libc.statx
+            func.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_uint, ctypes.POINTER(_Statx)]
+            func.restype = ctypes.c_int
+
+            buf = _Statx()
+            if func(AT_FDCWD, b"/", STATX_FLAGS, STATX_MASK, ctypes.byref(buf)) == 0:
+                _libc_statx = func
+                _HAVE_STATX = True
+            else:
+                _HAVE_STATX = False
+        except (OSError, AttributeError):
+            _HAVE_STATX = False
+
+    return _HAVE_STATX
+
+
+def statx(dir_fd: int, name: str) -> Union[StatxResult, os.stat_result]:
+    """
+    Stat a file relative to an open directory without following symlinks.
+
+    available() must have returned True before this is called.
+
+    Args:
+        dir_fd: File descriptor of the containing directory (O_PATH is enough)
+        name: Name of the entry inside that directory
+
+    Returns:
+        StatxResult, or an os.stat_result if the filesystem could not supply
+        every requested field
+
+    Raises:
+        OSError: If the underlying syscall fails
+    """
+    buf = _Statx()
+    if _libc_statx(dir_fd, os.fsencode(name), STATX_FLAGS, STATX_MASK, ctypes.byref(buf)) != 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), name)
+
+    if buf.stx_mask & STATX_MASK != STATX_MASK:
+        return os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+
+    return StatxResult(
+        st_nlink=buf.stx_nlink,
+        st_size=buf.stx_size,
+        st_ino=buf.stx_ino,
+        st_mtime=buf.stx_mtime.tv_sec + buf.stx_mtime.tv_nsec / 1e9,
+        st_dev=os.makedev(buf.stx_dev_major, buf.stx_dev_minor),
+    )
@@ -0,0 +1,355 @@
+/*
+ * Native directory scanner for the Hardlink Checker
+ *
+ * Optional C implementation of HardlinkChecker._scan_single_directory. It
+ * lists one directory with readdir(), stats the first batch of its regular
+ * files in inode order with statx(AT_STATX_DONT_SYNC) relative to the
+ * directory fd, and only builds Python objects for subdirectories,
+ * non-hardlinked files and the files left for the checker's stat batches.
+ * All syscalls run with the GIL released so the worker threads overlap.
+ *
+ * Build with:  python3 setup.py build_ext --inplace
+ *
+ * Author: OlickQC
+ * License: MIT
+ */
+
+#define _GNU_SOURCE
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <dirent.h>
+#include <errno.h>
+#include <fcntl.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/stat.h>
+
+typedef struct {
+    char *name;
+    ino_t d_ino;
+    int err;                /* errno from stat, 0 on success */
+    unsigned long long nlink;
+    unsigned long long size;
+    unsigned long long ino;
+    double mtime;
+} entry_t;
+
+typedef struct {
+    entry_t *items;
+    size_t len;
+    size_t cap;
+} entry_list_t;
+
+static void
+entry_list_free(entry_list_t *list)
+{
+    for (size_t i = 0; i < list->len; i++)
+        free(list->items[i].name);
+    free(list->items);
+}
+
+static int
+entry_list_push(entry_list_t *list, const char *name, ino_t d_ino)
+{
+    if (list->len == list->cap) {
+        size_t cap = list->cap ? list->cap * 2 : 64;
+        entry_t *items = realloc(list->items, cap * sizeof(entry_t));
+        if (items == NULL)
+            return -1;
+        list->items = items;
+        list->cap = cap;
+    }
+
+    entry_t *e = &list->items[list->len];
+    memset(e, 0, sizeof(*e));
+    e->name = strdup(name);
+    if (e->name == NULL)
+        return -1;
+    e->d_ino = d_ino;
+    list->len++;
+    return 0;
+}
+
+static int
+compare_inode(const void *a, const void *b)
+{
+    ino_t x = ((const entry_t *)a)->d_ino;
+    ino_t y = ((const entry_t *)b)->d_ino;
+    return (x > y) - (x < y);
+}
+
+#ifdef STATX_NLINK
+/* Cleared on the first ENOSYS/EPERM so older kernels use fstatat() */
+static int have_statx = 1;
+#endif
+
+static void
+stat_entry(int dir_fd, entry_t *e)
+{
+#ifdef STATX_NLINK
+    if (have_statx) {
+        struct statx stx;
+        if (statx(dir_fd, e->name, AT_SYMLINK_NOFOLLOW | AT_STATX_DONT_SYNC,
+                  STATX_NLINK | STATX_SIZE | STATX_INO | STATX_MTIME, &stx) == 0) {
+            e->nlink = stx.stx_nlink;
+            e->size = stx.stx_size;
+            e->ino = stx.stx_ino;
+            e->mtime = (double)stx.stx_mtime.tv_sec + stx.stx_mtime.tv_nsec / 1e9;
+            return;
+        }
+        if (errno != ENOSYS && errno != EPERM) {
+            e->err = errno;
+            return;
+        }
+        have_statx = 0;
+    }
+#endif
+
+    struct stat st;
+    if (fstatat(dir_fd, e->name, &st, AT_SYMLINK_NOFOLLOW) != 0) {
+        e->err = errno;
+        return;
+    }
+    e->nlink = st.st_nlink;
+    e->size = st.st_size;
+    e->ino = st.st_ino;
+    e->mtime = (double)st.st_mtim.tv_sec + st.st_mtim.tv_nsec / 1e9;
+}
+
+/*
+ * List dir_path and stat the first `limit` of its regular files in inode
+ * order. Runs without the GIL.
+ * Returns 0 on success, or an errno value if the directory can't be opened.
+ * If listing fails partway, *read_err is set and the entries found so far
+ * are kept, like the os.scandir() path does.
+ */
+static int
+list_and_stat(const char *dir_path, entry_list_t *subdirs, entry_list_t *files, size_t limit, int *read_err)
+{
+    *read_err = 0;
+
+    DIR *dir = opendir(dir_path);
+    if (dir == NULL)
+        return errno;
+
+    int dir_fd = dirfd(dir);
+    struct dirent *d;
+
+    for (;;) {
+        errno = 0;
+        d = readdir(dir);
+        if (d == NULL) {
+            *read_err = errno;
+            break;
+        }
+
+        const char *name = d->d_name;
+        if (name[0] == '.' && (name[1] == '\0' || (name[1] == '.' && name[2] == '\0')))
+            continue;
+
+        unsigned char type = d->d_type;
+        if (type == DT_UNKNOWN) {
+            struct stat st;
+            if (fstatat(dir_fd, name, &st, AT_SYMLINK_NOFOLLOW) != 0) {
+                /* Vanished entries are skipped, other errors end the listing */
+                if (errno == ENOENT)
+                    continue;
+                *read_err = errno;
+                break;
+            }
+            type = S_ISDIR(st.st_mode) ? DT_DIR : S_ISREG(st.st_mode) ? DT_REG : DT_UNKNOWN;
+        }
+
+        /* Symlinks, FIFOs, sockets and device nodes are skipped */
+        int rc = 0;
+        if (type == DT_DIR)
+            rc = entry_list_push(subdirs, name, d->d_ino);
+        else if (type == DT_REG)
+            rc = entry_list_push(files, name, d->d_ino);
+        if (rc != 0) {
+            closedir(dir);
+            return ENOMEM;
+        }
+    }
+
+    /* Stat in inode order to keep disk reads close together */
+    if (files->len > 1)
+        qsort(files->items, files->len, sizeof(entry_t), compare_inode);
+
+    for (size_t i = 0; i < files->len && i < limit; i++)
+        stat_entry(dir_fd, &files->items[i]);
+
+    closedir(dir);
+    return 0;
+}
+
+static PyObject *
+join_path(const char *dir_path, size_t dir_len, const char *name)
+{
+    size_t name_len = strlen(name);
+    int need_sep = dir_len > 0 && dir_path[dir_len - 1] != '/';
+    size_t len = dir_len + need_sep + name_len;
+
+    char *buf = PyMem_Malloc(len + 1);
+    if (buf == NULL)
+        return PyErr_NoMemory();
+    memcpy(buf, dir_path, dir_len);
+    if (need_sep)
+        buf[dir_len] = '/';
+    memcpy(buf + dir_len + need_sep, name, name_len + 1);
+
+    PyObject *path = PyUnicode_DecodeFSDefaultAndSize(buf, (Py_ssize_t)len);
+    PyMem_Free(buf);
+    return path;
+}
+
+static PyObject *
+build_result(const char *dir_path, entry_list_t *subdirs, entry_list_t *files,
+             PyObject *stat_factory, unsigned long long min_size, size_t limit, int read_err)
+{
+    size_t dir_len = strlen(dir_path);
+    size_t stat_count = files->len < limit ? files->len : limit;
+    unsigned long long total_size = 0;
+    Py_ssize_t skipped = 0;
+    PyObject *subdir_list = PyList_New(0);
+    PyObject *file_list = PyList_New(0);
+    PyObject *rest_list = PyList_New(0);
+    PyObject *failed_list = PyList_New(0);
+    PyObject *item = NULL;
+
+    if (subdir_list == NULL || file_list == NULL || rest_list == NULL || failed_list == NULL)
+        goto error;
+
+    for (size_t i = 0; i < subdirs->len; i++) {
+        item = join_path(dir_path, dir_len, subdirs->items[i].name);
+        if (item == NULL || PyList_Append(subdir_list, item) != 0)
+            goto error;
+        Py_CLEAR(item);
+    }
+
+    /* Files past the limit go back unstat'd as (name, d_ino) */
+    for (size_t i = stat_count; i < files->len; i++) {
+        entry_t *e = &files->items[i];
+        PyObject *name = PyUnicode_DecodeFSDefault(e->name);
+        if (name == NULL)
+            goto error;
+        item = Py_BuildValue("(NK)", name, (unsigned long long)e->d_ino);
+        if (item == NULL || PyList_Append(rest_list, item) != 0)
+            goto error;
+        Py_CLEAR(item);
+    }
+
+    for (size_t i = 0; i < stat_count; i++) {
+        entry_t *e = &files->items[i];
+
+        if (e->err != 0) {
+            PyObject *path = join_path(dir_path, dir_len, e->name);
+            if (path == NULL)
+                goto error;
+            item = Py_BuildValue("(Ns)", path, strerror(e->err));
+            if (item == NULL || PyList_Append(failed_list, item) != 0)
+                goto error;
+            Py_CLEAR(item);
+            continue;
+        }
+
+        total_size += e->size;
+        if (e->nlink > 1)
+            continue;
+        if (e->size < min_size) {
+            skipped++;
+            continue;
+        }
+
+        PyObject *path = join_path(dir_path, dir_len, e->name);
+        if (path == NULL)
+            goto error;
+        PyObject *stat_info = PyObject_CallFunction(stat_factory, "KKKd", e->nlink, e->size, e->ino, e->mtime);
+        if (stat_info == NULL) {
+            Py_DECREF(path);
+            goto error;
+        }
+        item = Py_BuildValue("(NN)", path, stat_info);
+        if (item == NULL || PyList_Append(file_list, item) != 0)
+            goto error;
+        Py_CLEAR(item);
+    }
+
+    return Py_BuildValue("(NNNnKNni)", subdir_list, file_list, rest_list, (Py_ssize_t)stat_count, total_size,
+                         failed_list, skipped, read_err);
+
+error:
+    Py_XDECREF(item);
+    Py_XDECREF(subdir_list);
+    Py_XDECREF(file_list);
+    Py_XDECREF(rest_list);
+    Py_XDECREF(failed_list);
+    return NULL;
+}
+
+PyDoc_STRVAR(scan_dir_doc,
+"scan_dir(dir_path, stat_factory, min_size, limit) -> (subdirs, non_hardlinked, rest, total_files, total_size, failed, skipped, read_errno)\n"
+"\n"
+"Scan the immediate contents of one directory. Only the first limit regular\n"
+"files in inode order are stat'd; rest lists (name, d_ino) for the others,\n"
+"still in inode order, and total_files counts only the stat'd ones.\n"
+"stat_factory is called as stat_factory(st_nlink, st_size, st_ino, st_mtime)\n"
+"for each non-hardlinked file of at least min_size bytes; smaller ones are\n"
+"only counted in skipped. failed lists (path, error message) for files that\n"
+"could not be stat'd. read_errno is non-zero if listing stopped partway; the\n"
+"entries found up to that point are still returned. Raises OSError if the\n"
+"directory itself cannot be opened.");
+
+static PyObject *
+scan_dir(PyObject *module, PyObject *args)
+{
+    PyObject *path_bytes = NULL;
+    PyObject *stat_factory;
+    unsigned long long min_size;
+    Py_ssize_t limit;
+    entry_list_t subdirs = {0}, files = {0};
+    int err, read_err;
+
+    if (!PyArg_ParseTuple(args, "O&OKn:scan_dir", PyUnicode_FSConverter, &path_bytes, &stat_factory, &min_size, &limit))
+        return NULL;
+
+    const char *dir_path = PyBytes_AS_STRING(path_bytes);
+    size_t stat_limit = limit < 0 ? 0 : (size_t)limit;
+
+    Py_BEGIN_ALLOW_THREADS
+    err = list_and_stat(dir_path, &subdirs, &files, stat_limit, &read_err);
+    Py_END_ALLOW_THREADS
+
+    PyObject *result;
+    if (err != 0) {
+        errno = err;
+        result = PyErr_SetFromErrnoWithFilename(PyExc_OSError, dir_path);
+    } else {
+        result = build_result(dir_path, &subdirs, &files, stat_factory, min_size, stat_limit, read_err);
+    }
+
+    entry_list_free(&subdirs);
+    entry_list_free(&files);
+    Py_DECREF(path_bytes);
+    return result;
+}
+
+static PyMethodDef walker_methods[] = {
+    {"scan_dir", scan_dir, METH_VARARGS, scan_dir_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef walker_module = {
+    PyModuleDef_HEAD_INIT,
+    "_walker",
+    "Native directory scanner for the Hardlink Checker.",
+    -1,
+    walker_methods
+};
+
+PyMODINIT_FUNC
+PyInit__walker(void)
+{
+    return PyModule_Create(&walker_module);
+}
@@ -11,11 +11,395 @@ License: MIT
 
 import os
 import sys
+import stat
 import json
+import struct
+import heapq
+import tempfile
+import math
+import time
 import logging
+import operator
+import functools
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Set, Tuple, NamedTuple, Iterator, Optional, Callable, TextIO, Union, Any
+
+try:
+    import _statx
+except ImportError:
+    _statx = None
+
+# Optional compiled directory scanner, built with "python3 setup.py build_ext --inplace"
+try:
+    import _walker
+except ImportError:
+    _walker = None
+
+
+# Number of directories scanned concurrently when "stat_threads" is not set
+DEFAULT_STAT_THREADS = 16
+
+# Files stat'd per worker task; larger directories are split into several
+# tasks so their stat() calls are spread across the thread pool
+STAT_BATCH_SIZE = 64
+
+# Upper bound on hardlinked inodes remembered by the inode cache. The other
+# link usually lives outside the scan path (cross-seed's torrents folder), so
+# most entries are never evicted; past this limit new inodes are not cached.
+INODE_CACHE_MAX_ENTRIES = 1 << 18
+
+# Seconds between progress log lines during a scan
+PROGRESS_INTERVAL = 2.0
+
+# Flags for the per-directory fd that entry names are stat'd against
+DIR_FD_FLAGS = os.O_RDONLY | os.O_DIRECTORY | getattr(os, "O_PATH", 0)
+
+
+# Report records buffered before each writelines() call
+REPORT_BATCH_SIZE = 1000
+
+# Write buffer for the report file
+REPORT_BUFFER_SIZE = 1 << 20
+
+# Spooled records sorted in memory before being written out as one run
+SPOOL_RUN_SIZE = 1 << 16
+
+# Bytes read at a time from each sorted run while merging them
+SPOOL_READ_SIZE = 1 << 16
+
+# Spooled record header: size, link count, inode, mtime (whole seconds) and
+# the length of the os.fsencode()d path bytes that follow
+_RECORD = struct.Struct("<qIQqH")
+
+# Size units, indexed by the power of 1024
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Report banners, built once rather than per record
+_RULE = "=" * 80 + "\n"
+_FILES_BANNER = _RULE + "NON-HARDLINKED FILES\n" + _RULE + "\n"
+_ALL_HARDLINKED_BANNER = _RULE + "All files are properly hardlinked!\n" + _RULE
+
+
+def _human_readable_size(size_bytes: int) -> str:
+    """
+    Convert bytes to human-readable format.
+
+    The unit is picked from the bit length of the size instead of dividing
+    by 1024 in a loop.
+
+    Args:
+        size_bytes: Size in bytes
+
+    Returns:
+        Human-readable size string
+    """
+    unit_idx = max(0, min(len(_UNITS) - 1, (size_bytes.bit_length() - 1) // 10))
+    return f"{size_bytes / (1 << (unit_idx * 10)):.2f} {_UNITS[unit_idx]}"
+
+
+@functools.lru_cache(maxsize=8192)
+def _format_mtime(mtime: int) -> str:
+    """
+    Format a modification time as a local timestamp string.
+
+    Cached because files copied with preserved times often share the same
+    mtime, and fromtimestamp() + strftime() are comparatively expensive.
+
+    Args:
+        mtime: Modification time in whole seconds since the epoch
+
+    Returns:
+        Timestamp string
+    """
+    return datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class FileStat(NamedTuple):
+    """Subset of os.stat_result used by the native scanner and the record spool."""
+
+    st_nlink: int
+    st_size: int
+    st_ino: int
+    st_mtime: float
+
+
+# Stat results that reach the report: os.stat() results, statx() results
+# from _statx, and FileStat from the native scanner and the record spool.
+# All of them provide st_nlink, st_size, st_ino and st_mtime.
+StatResult = Union[os.stat_result, "_statx.StatxResult", FileStat]
+
+
+class DirectoryScan(NamedTuple):
+    """Result of scanning a directory, or one batch of its files."""
+
+    dir_path: str
+    subdirs: List[str]
+    batches: List[List[Tuple[str, int]]]
+    non_hardlinked: List[Tuple[str, StatResult]]
+    total_files: int
+    total_size: int
+    errors: int
+    skipped: int
+
+
+class RecordSpool:
+    """
+    Compact binary spool of the non-hardlinked files found by a scan.
+
+    The scan only packs raw stat fields into an anonymous temporary file;
+    sizes, dates and report text are formatted in a separate render pass
+    once the scan is finished. Worker threads finish in a different order
+    on every run, so the spool is an external sort: records are written in
+    path-sorted runs of SPOOL_RUN_SIZE and merged when read back, keeping
+    the report repeatable without holding every path in memory.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Create the spool file.
+
+        Args:
+            directory: Directory to create the temporary file in
+        """
+        self._f = tempfile.TemporaryFile(dir=directory, buffering=REPORT_BUFFER_SIZE)
+        self._pack = _RECORD.pack
+        # (os.fsencode()d path, record header) not yet written out
+        self._run: List[Tuple[bytes, bytes]] = []
+        # (start, end) file offsets of each sorted run
+        self._runs: List[Tuple[int, int]] = []
+        self._offset = 0
+
+    def __enter__(self) -> "RecordSpool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self._f.close()
+
+    def add(self, file_path: str, stat_info: StatResult):
+        """
+        Append one file record.
+
+        Args:
+            file_path: Path of the file
+            stat_info: Stat result of the file
+        """
+        encoded = os.fsencode(file_path)
+        run = self._run
+        run.append((encoded, self._pack(
+            stat_info.st_size, stat_info.st_nlink, stat_info.st_ino,
+            math.floor(stat_info.st_mtime), len(encoded)
+        )))
+        if len(run) >= SPOOL_RUN_SIZE:
+            self._write_run()
+
+    def _write_run(self):
+        """Sort the buffered records by path and write them out as one run."""
+        run = self._run
+        if not run:
+            return
+
+        run.sort()
+        start = self._offset
+        for encoded, header in run:
+            self._offset += self._f.write(header + encoded)
+        self._runs.append((start, self._offset))
+        run.clear()
+
+    def _read_run(self, start: int, end: int) -> Iterator[Tuple[bytes, int, int, int, int]]:
+        """
+        Read one sorted run sequentially, SPOOL_READ_SIZE bytes at a time.
+
+        Args:
+            start: File offset of the first record
+            end: File offset just past the last record
+
+        Yields:
+            Tuples of encoded path, size, link count, inode and mtime
+        """
+        fd = self._f.fileno()
+        pread = os.pread
+        unpack_from = _RECORD.unpack_from
+        header_size = _RECORD.size
+        buf = b""
+        pos = 0
+        offset = start
+        while pos < len(buf) or offset < end:
+            if len(buf) - pos >= header_size:
+                size, nlink, ino, mtime, path_len = unpack_from(buf, pos)
+                record_end = pos + header_size + path_len
+                if record_end <= len(buf):
+                    yield buf[pos + header_size:record_end], size, nlink, ino, mtime
+                    pos = record_end
+                    continue
+
+            # The next record runs past the buffered bytes
+            chunk = pread(fd, min(SPOOL_READ_SIZE, end - offset), offset)
+            if not chunk:
+                return
+            buf = buf[pos:] + chunk
+            pos = 0
+            offset += len(chunk)
+
+    def __iter__(self) -> Iterator[Tuple[str, FileStat]]:
+        """
+        Read the records back in path order.
+
+        Yields:
+            Tuples of file path and FileStat
+        """
+        self._write_run()
+        self._f.flush()
+
+        runs = [self._read_run(start, end) for start, end in self._runs]
+        for encoded, size, nlink, ino, mtime in heapq.merge(*runs):
+            yield os.fsdecode(encoded), FileStat(nlink, size, ino, mtime)
+
+
+class ReportWriter(ABC):
+    """
+    Writes the report from the summary and the spooled file records.
+
+    Subclasses provide the summary and record formatting.
+    """
+
+    def __init__(self, f: TextIO, summary: Dict[str, Any]):
+        """
+        Initialize the writer and write the header and summary.
+
+        Args:
+            f: Report file opened for writing
+            summary: Summary statistics dictionary
+        """
+        self._f = f
+        self._count = 0
+        self._batch: List[str] = []
+        f.write(self._format_summary(summary))
+
+    @abstractmethod
+    def _format_summary(self, summary: Dict[str, Any]) -> str:
+        """
+        Format the report header and summary statistics.
+
+        Args:
+            summary: Summary statistics dictionary
+
+        Returns:
+            Header and summary text
+        """
+
+    @abstractmethod
+    def _format_file(self, index: int, file_info: Dict[str, Any]) -> str:
+        """
+        Format one non-hardlinked file record.
+
+        Args:
+            index: 1-based position of the file in the report
+            file_info: File details from HardlinkChecker.get_file_details
+
+        Returns:
+            Record text
+        """
+
+    def _format_footer(self) -> str:
+        """
+        Format anything written after the last record.
+
+        Returns:
+            Footer text, empty by default
+        """
+        return ""
+
+    def write_file(self, file_info: Dict[str, Any]):
+        """
+        Append one non-hardlinked file to the report.
+
+        Records are buffered and written REPORT_BATCH_SIZE at a time with
+        writelines().
+
+        Args:
+            file_info: File details from HardlinkChecker.get_file_details
+        """
+        self._count += 1
+        batch = self._batch
+        batch.append(self._format_file(self._count, file_info))
+        if len(batch) >= REPORT_BATCH_SIZE:
+            self._f.writelines(batch)
+            batch.clear()
+
+    def finish(self):
+        """Write the remaining records and the footer."""
+        self._f.writelines(self._batch)
+        self._batch.clear()
+        self._f.write(self._format_footer())
+
+
+class TextReportWriter(ReportWriter):
+    """Human-readable text report."""
+
+    def _format_summary(self, summary: Dict[str, Any]) -> str:
+        lines = [
+            _RULE,
+            "HARDLINK CHECK REPORT\n",
+            _RULE + "\n",
+            "SUMMARY STATISTICS\n",
+            "-" * 80 + "\n",
+            f"Scan Path:                {summary['scan_path']}\n",
+            f"Scan Timestamp:           {summary['scan_timestamp']}\n",
+            f"Total Files Scanned:      {summary['total_files_scanned']}\n",
+            f"Hardlinked Files:         {summary['hardlinked_count']}\n",
+            f"Non-Hardlinked Files:     {summary['non_hardlinked_count']}\n",
+            f"Errors Encountered:       {summary['errors']}\n",
+        ]
+        if summary['min_size_bytes']:
+            min_size = _human_readable_size(summary['min_size_bytes'])
+            lines.append(f"Skipped Small Files:      {summary['skipped_small_count']} (under {min_size})\n")
+        lines += [
+            f"Total Size:               {summary['total_size']}\n",
+            f"Non-Hardlinked Size:      {summary['non_hardlinked_size']}\n",
+            f"Percentage Not Hardlinked: {summary['percentage_not_hardlinked']}%\n",
+            "\n",
+        ]
+        return "".join(lines)
+
+    def _format_file(self, index: int, file_info: Dict[str, Any]) -> str:
+        record = (
+            f"[{index}] {file_info['path']}\n"
+            f"    Size:         {file_info['size_human']} ({file_info['size_bytes']} bytes)\n"
+            f"    Link Count:   {file_info['link_count']}\n"
+            f"    Inode:        {file_info['inode']}\n"
+            f"    Modified:     {file_info['modified']}\n"
+            "\n"
+        )
+        return _FILES_BANNER + record if index == 1 else record
+
+    def _format_footer(self) -> str:
+        return _ALL_HARDLINKED_BANNER if self._count == 0 else ""
+
+
+class JsonlReportWriter(ReportWriter):
+    """
+    Newline-delimited JSON report.
+
+    The first line is the summary object, followed by one object per
+    non-hardlinked file.
+    """
+
+    def _format_summary(self, summary: Dict[str, Any]) -> str:
+        return json.dumps(summary) + "\n"
+
+    def _format_file(self, index: int, file_info: Dict[str, Any]) -> str:
+        return json.dumps(file_info) + "\n"
+
+
+# Report writers selectable with the "report_format" option
+REPORT_WRITERS = {
+    "text": TextReportWriter,
+    "jsonl": JsonlReportWriter,
+}
 
 
 class HardlinkChecker:
@@ -39,6 +423,20 @@ class HardlinkChecker:
         output_dir = output_base.parent
         self.output_path = output_dir / f"{output_stem}_{timestamp}{output_suffix}"
         
+        # Non-hardlinked files smaller than this are counted but left out of the report
+        self.min_size_bytes = self.config.get("min_size_bytes", 0)
+
+        # Resolved at scan time; statx() is used for the hot stat loop when available
+        self._use_statx = False
+
+        # (st_dev, st_ino) -> (st_size, links not yet visited) for hardlinked
+        # files, so further paths to the same inode are not stat'd again
+        self._inode_cache: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._inode_lock = threading.Lock()
+        # Devices whose readdir inode numbers do not match stat; the inode
+        # cache is bypassed for these as well as for anonymous devices
+        self._untrusted_devs: Set[int] = set()
+
         self._setup_logging()
 
     def _load_config(self, config_path: str) -> dict:
@@ -66,6 +464,18 @@ class HardlinkChecker:
             if missing_keys:
                 raise KeyError(f"Missing required configuration keys: {missing_keys}")
 
+            report_format = config.get("report_format", "text")
+            if report_format not in REPORT_WRITERS:
+                raise KeyError(f"Unknown report_format '{report_format}', expected one of: {list(REPORT_WRITERS)}")
+
+            stat_threads = config.get("stat_threads", DEFAULT_STAT_THREADS)
+            if type(stat_threads) is not int or stat_threads < 1:
+                raise KeyError(f"Invalid stat_threads '{stat_threads}', expected a positive integer")
+
+            min_size_bytes = config.get("min_size_bytes", 0)
+            if type(min_size_bytes) is not int or min_size_bytes < 0:
+                raise KeyError(f"Invalid min_size_bytes '{min_size_bytes}', expected a whole number of bytes")
+
             return config
 
         except FileNotFoundError:
@@ -91,122 +501,338 @@ class HardlinkChecker:
             ]
         )
 
-    def is_hardlinked(self, file_path: Path) -> bool:
+    def is_hardlinked(self, stat_info: StatResult) -> bool:
         """
         Check if a file is hardlinked.
 
         Args:
-            file_path: Path to the file to check
+            stat_info: Stat result of the file to check
 
         Returns:
             True if the file has more than one hard link, False otherwise
         """
-        try:
-            stat_info = file_path.stat()
-            # A file is considered hardlinked if its link count > 1
-            return stat_info.st_nlink > 1
-        except (OSError, PermissionError) as e:
-            logging.warning(f"Unable to check hardlink status for {file_path}: {e}")
-            return True  # Assume hardlinked to exclude from report
+        # A file is considered hardlinked if its link count > 1
+        return stat_info.st_nlink > 1
 
-    def get_file_details(self, file_path: Path) -> Optional[Dict[str, Any]]:
+    def get_file_details(self, file_path: str, stat_info: StatResult) -> Dict[str, Any]:
         """
         Get detailed information about a file.
 
         Args:
             file_path: Path to the file
+            stat_info: Stat result of the file, fetched once by the scan loop
 
         Returns:
-            Dictionary containing file details or None if unable to retrieve
+            Dictionary containing file details
+        """
+        return {
+            "path": file_path,
+            "size_bytes": stat_info.st_size,
+            "size_human": _human_readable_size(stat_info.st_size),
+            "link_count": stat_info.st_nlink,
+            "inode": stat_info.st_ino,
+            "modified": _format_mtime(math.floor(stat_info.st_mtime))
+        }
+
+    def _visit_cached_inode(self, key: Tuple[int, int]) -> Optional[int]:
         """
+        Look up an already-seen hardlinked inode and record this visit.
+
+        Once every link of the inode has been visited the entry is evicted,
+        freeing its slot for inodes whose links all sit inside the scan path.
+
+        Args:
+            key: (st_dev, st_ino) of the directory entry
+
+        Returns:
+            The cached file size, or None if the inode has not been seen yet
+        """
+        with self._inode_lock:
+            cached = self._inode_cache.get(key)
+            if cached is None:
+                return None
+            size, remaining = cached
+            if remaining <= 1:
+                del self._inode_cache[key]
+            else:
+                self._inode_cache[key] = (size, remaining - 1)
+            return size
+
+    def _cache_inode(self, key: Tuple[int, int], stat_info: StatResult):
+        """
+        Remember a hardlinked inode so its other links skip the stat() call.
+
+        Nothing is added once the cache holds INODE_CACHE_MAX_ENTRIES inodes.
+
+        Args:
+            key: (st_dev, st_ino) of the directory entry, as used for lookups
+            stat_info: Stat result of a file with more than one link
+        """
+        with self._inode_lock:
+            if len(self._inode_cache) < INODE_CACHE_MAX_ENTRIES:
+                self._inode_cache.setdefault(key, (stat_info.st_size, stat_info.st_nlink - 1))
+
+    def _scan_single_directory(self, dir_path: str) -> DirectoryScan:
+        """
+        Scan the immediate contents of one directory.
+
+        Runs on a worker thread. Uses os.scandir so the file type comes from
+        the directory listing itself; only regular files are checked, and
+        symbolic links are skipped and never followed. The first
+        STAT_BATCH_SIZE files are stat'd here, the rest are handed back as
+        batches for other workers.
+
+        Args:
+            dir_path: Directory to scan
+
+        Returns:
+            DirectoryScan with the subdirectories and file batches to queue,
+            the non-hardlinked files found and the per-directory counters
+        """
+        subdirs: List[str] = []
+        # (name, readdir inode) of each regular file
+        files: List[Tuple[str, int]] = []
+
         try:
-            stat_info = file_path.stat()
-            return {
-                "path": str(file_path),
-                "size_bytes": stat_info.st_size,
-                "size_human": self._human_readable_size(stat_info.st_size),
-                "link_count": stat_info.st_nlink,
-                "inode": stat_info.st_ino,
-                "modified": datetime.fromtimestamp(stat_info.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-            }
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    # Symlinks, FIFOs, sockets and device nodes are neither and
+                    # are skipped; d_type answers both checks without a syscall
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append((entry.name, entry.inode()))
+
         except (OSError, PermissionError) as e:
-            logging.warning(f"Unable to get details for {file_path}: {e}")
-            return None
+            logging.warning(f"Unable to read directory {dir_path}: {e}")
+
+        # Stat in inode order: on spinning disks this keeps inode table reads
+        # close together instead of following creation/hash order
+        files.sort(key=operator.itemgetter(1))
 
-    def _human_readable_size(self, size_bytes: int) -> str:
+        batches = [files[i:i + STAT_BATCH_SIZE] for i in range(STAT_BATCH_SIZE, len(files), STAT_BATCH_SIZE)]
+        result = self._stat_entries(dir_path, files[:STAT_BATCH_SIZE])
+        return result._replace(subdirs=subdirs, batches=batches)
+
+    def _scan_single_directory_native(self, dir_path: str) -> DirectoryScan:
         """
-        Convert bytes to human-readable format.
+        Scan the immediate contents of one directory with the _walker extension.
+
+        Runs on a worker thread. Listing, inode ordering and statx() for the
+        first STAT_BATCH_SIZE files all happen in C with the GIL released;
+        only subdirectories, non-hardlinked files and the remaining file
+        names are turned into Python objects. The remaining files are handed
+        back as batches for _stat_entries, so large directories are still
+        spread across the thread pool and use the inode cache.
 
         Args:
-            size_bytes: Size in bytes
+            dir_path: Directory to scan
 
         Returns:
-            Human-readable size string
+            DirectoryScan with the subdirectories and file batches to queue,
+            the non-hardlinked files found and the per-directory counters
         """
-        size: float = float(size_bytes)
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024.0:
-                return f"{size:.2f} {unit}"
-            size /= 1024.0
-        return f"{size:.2f} PB"
+        try:
+            subdirs, non_hardlinked, rest, total_files, total_size, failed, skipped, read_errno = _walker.scan_dir(
+                dir_path, FileStat, self.min_size_bytes, STAT_BATCH_SIZE
+            )
+        except (OSError, PermissionError) as e:
+            logging.warning(f"Unable to read directory {dir_path}: {e}")
+            return DirectoryScan(dir_path, [], [], [], 0, 0, 0, 0)
+
+        # Listing stopped partway; what was found is still scanned
+        if read_errno:
+            e = OSError(read_errno, os.strerror(read_errno), dir_path)
+            logging.warning(f"Unable to read directory {dir_path}: {e}")
+
+        for file_path, error in failed:
+            logging.warning(f"Error processing {file_path}: {error}")
 
-    def scan_directory(self) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        batches = [rest[i:i + STAT_BATCH_SIZE] for i in range(0, len(rest), STAT_BATCH_SIZE)]
+        return DirectoryScan(dir_path, subdirs, batches, non_hardlinked, total_files, total_size, len(failed), skipped)
+
+    def _stat_entries(self, dir_path: str, entries: List[Tuple[str, int]]) -> DirectoryScan:
         """
-        Scan directory recursively for non-hardlinked files.
+        Stat a batch of file entries from one directory.
+
+        Runs on a worker thread. Each file is stat'd exactly once, relative
+        to a directory fd - via statx() when available, otherwise via
+        os.stat(dir_fd=...). Further links to an already-seen hardlinked inode
+        are answered from the inode cache without any stat() call.
+
+        Args:
+            dir_path: Directory containing the entries
+            entries: (name, readdir inode) of each file to stat
 
         Returns:
-            Tuple containing:
-                - List of non-hardlinked file details
-                - Dictionary of summary statistics
+            DirectoryScan with the non-hardlinked files found and the batch counters
+        """
+        non_hardlinked: List[Tuple[str, StatResult]] = []
+        total_files = len(entries)
+        total_size = 0
+        errors = 0
+        skipped = 0
+
+        if not entries:
+            return DirectoryScan(dir_path, [], [], non_hardlinked, total_files, total_size, errors, skipped)
+
+        dir_fd: Optional[int] = None
+        try:
+            # Entries are stat'd relative to this fd, so the kernel resolves
+            # the directory path once instead of once per file
+            dir_fd = os.open(dir_path, DIR_FD_FLAGS)
+            dir_dev = os.fstat(dir_fd).st_dev
+            # Union filesystems such as shfs user shares and mergerfs expose
+            # inode numbers from several member disks under one anonymous
+            # (major 0) device, so (st_dev, st_ino) is not unique there and a
+            # cache hit could hide a non-hardlinked file
+            use_inode_cache = os.major(dir_dev) != 0 and dir_dev not in self._untrusted_devs
+
+            # Pre-bound for the per-file loop
+            inode_cache = self._inode_cache
+            visit_cached_inode = self._visit_cached_inode
+            is_hardlinked = self.is_hardlinked
+            append = non_hardlinked.append
+            statx = _statx.statx if self._use_statx else None
+            os_stat = os.stat
+            min_size_bytes = self.min_size_bytes
+
+            for name, inode in entries:
+                # Another link to this inode was already stat'd. The unlocked
+                # membership test keeps cache misses, the common case, free of
+                # lock traffic; _visit_cached_inode re-checks under the lock.
+                if use_inode_cache:
+                    key = (dir_dev, inode)
+                    if key in inode_cache:
+                        cached_size = visit_cached_inode(key)
+                        if cached_size is not None:
+                            total_size += cached_size
+                            continue
+
+                try:
+                    if statx is not None:
+                        stat_info = statx(dir_fd, name)
+                    else:
+                        stat_info = os_stat(name, dir_fd=dir_fd, follow_symlinks=False)
+                except (OSError, PermissionError) as e:
+                    logging.warning(f"Error processing {os.path.join(dir_path, name)}: {e}")
+                    errors += 1
+                    continue
+
+                total_size += stat_info.st_size
+                if not is_hardlinked(stat_info):
+                    # Tiny files are dropped before anything is built for them
+                    if stat_info.st_size >= min_size_bytes:
+                        append((os.path.join(dir_path, name), stat_info))
+                    else:
+                        skipped += 1
+                elif use_inode_cache:
+                    # Only trust readdir inode numbers that match stat
+                    if inode == stat_info.st_ino:
+                        self._cache_inode((dir_dev, stat_info.st_ino), stat_info)
+                    else:
+                        self._untrusted_devs.add(dir_dev)
+                        use_inode_cache = False
+
+        except (OSError, PermissionError) as e:
+            # The directory itself could not be opened; none of its files were checked
+            logging.warning(f"Unable to open directory {dir_path}: {e}")
+            errors = total_files
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+
+        return DirectoryScan(dir_path, [], [], non_hardlinked, total_files, total_size, errors, skipped)
+
+    def _validate_scan_path(self):
+        """
+        Check that the configured scan path is an existing directory.
+
+        Raises:
+            FileNotFoundError: If the scan path doesn't exist
+            NotADirectoryError: If the scan path is not a directory
         """
-        if not self.scan_path.exists():
-            raise FileNotFoundError(f"Scan path does not exist: {self.scan_path}")
+        # One stat() answers both checks
+        try:
+            mode = self.scan_path.stat().st_mode
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Scan path does not exist: {self.scan_path}") from e
 
-        if not self.scan_path.is_dir():
+        if not stat.S_ISDIR(mode):
             raise NotADirectoryError(f"Scan path is not a directory: {self.scan_path}")
 
+    def scan_directory(self, on_file: Callable[[str, StatResult], None]) -> Dict[str, Any]:
+        """
+        Scan directory recursively for non-hardlinked files.
+
+        Non-hardlinked files are passed to on_file as soon as they are found
+        rather than collected, so memory use does not grow with the number
+        of files reported. The scan path is checked by generate_report()
+        before this is called.
+
+        Args:
+            on_file: Called on the main thread with the path and stat result
+                of each non-hardlinked file
+
+        Returns:
+            Dictionary of summary statistics
+        """
         logging.info(f"Starting scan of: {self.scan_path}")
 
-        non_hardlinked_files: List[Dict[str, Any]] = []
         total_files = 0
         total_size = 0
+        non_hardlinked_count = 0
         non_hardlinked_size = 0
         errors = 0
-
-        try:
-            for root, dirs, files in os.walk(self.scan_path):
-                for filename in files:
-                    file_path = Path(root) / filename
-
-                    # Skip symbolic links
-                    if file_path.is_symlink():
-                        continue
-
-                    total_files += 1
-
-                    try:
-                        if not self.is_hardlinked(file_path):
-                            details = self.get_file_details(file_path)
-                            if details:
-                                non_hardlinked_files.append(details)
-                                non_hardlinked_size += details["size_bytes"]
-
-                        # Track total size
-                        stat_info = file_path.stat()
-                        total_size += stat_info.st_size
-
-                    except (OSError, PermissionError) as e:
-                        logging.warning(f"Error processing {file_path}: {e}")
-                        errors += 1
-                        continue
-
-                    # Log progress every 1000 files
-                    if total_files % 1000 == 0:
+        skipped = 0
+
+        stat_threads = self.config.get("stat_threads", DEFAULT_STAT_THREADS)
+        self._use_statx = _statx is not None and _statx.available()
+        logging.debug(f"Using statx(): {self._use_statx}")
+        self._inode_cache.clear()
+        if _walker is not None:
+            scan_single_directory = self._scan_single_directory_native
+        else:
+            scan_single_directory = self._scan_single_directory
+        logging.debug(f"Using native directory scanner: {_walker is not None}")
+        last_progress = time.monotonic()
+
+        # Directories are scanned concurrently so many stat() calls are in
+        # flight at once; results are folded in here on the main thread.
+        with ThreadPoolExecutor(max_workers=stat_threads) as pool:
+            pending = {pool.submit(scan_single_directory, str(self.scan_path))}
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        for subdir in result.subdirs:
+                            pending.add(pool.submit(scan_single_directory, subdir))
+                        for batch in result.batches:
+                            pending.add(pool.submit(self._stat_entries, result.dir_path, batch))
+
+                        total_files += result.total_files
+                        total_size += result.total_size
+                        errors += result.errors
+                        skipped += result.skipped
+
+                        for file_path, stat_info in result.non_hardlinked:
+                            on_file(file_path, stat_info)
+                            non_hardlinked_count += 1
+                            non_hardlinked_size += stat_info.st_size
+
+                    # Log progress on a timer; the wait() timeout keeps it
+                    # ticking even while workers are stuck on slow disks
+                    now = time.monotonic()
+                    if now - last_progress >= PROGRESS_INTERVAL:
                         logging.info(f"Processed {total_files} files...")
+                        last_progress = now
 
-        except KeyboardInterrupt:
-            logging.warning("Scan interrupted by user")
-            raise
+            except KeyboardInterrupt:
+                logging.warning("Scan interrupted by user")
+                for future in pending:
+                    future.cancel()
+                raise
 
         logging.info(f"Scan complete. Processed {total_files} files.")
 
@@ -214,67 +840,50 @@ class HardlinkChecker:
             "scan_path": str(self.scan_path),
             "scan_timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "total_files_scanned": total_files,
-            "non_hardlinked_count": len(non_hardlinked_files),
-            "hardlinked_count": total_files - len(non_hardlinked_files) - errors,
+            "non_hardlinked_count": non_hardlinked_count,
+            "hardlinked_count": total_files - non_hardlinked_count - errors - skipped,
             "errors": errors,
-            "total_size": self._human_readable_size(total_size),
-            "non_hardlinked_size": self._human_readable_size(non_hardlinked_size),
-            "percentage_not_hardlinked": round((len(non_hardlinked_files) / total_files * 100), 2) if total_files > 0 else 0
+            "min_size_bytes": self.min_size_bytes,
+            "skipped_small_count": skipped,
+            "total_size": _human_readable_size(total_size),
+            "non_hardlinked_size": _human_readable_size(non_hardlinked_size),
+            # Skipped small files are not hardlinked either, only left out of the list
+            "percentage_not_hardlinked": round(((non_hardlinked_count + skipped) / total_files * 100), 2) if total_files > 0 else 0
         }
 
-        return non_hardlinked_files, summary
+        return summary
 
-    def generate_report(self, non_hardlinked_files: List[Dict[str, Any]], summary: Dict[str, Any]):
+    def generate_report(self) -> Dict[str, Any]:
         """
-        Generate a text report of non-hardlinked files.
+        Scan the directory and write the report.
 
-        Args:
-            non_hardlinked_files: List of non-hardlinked file details
-            summary: Summary statistics dictionary
+        The scan spools non-hardlinked files to a temporary binary file; the
+        report is rendered from it afterwards, sorted by path, once the
+        summary is known.
+
+        Returns:
+            Summary statistics dictionary
         """
+        self._validate_scan_path()
+
         try:
             # Ensure output directory exists
             self.output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                # Write header
-                f.write("=" * 80 + "\n")
-                f.write("HARDLINK CHECK REPORT\n")
-                f.write("=" * 80 + "\n\n")
-
-                # Write summary
-                f.write("SUMMARY STATISTICS\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"Scan Path:                {summary['scan_path']}\n")
-                f.write(f"Scan Timestamp:           {summary['scan_timestamp']}\n")
-                f.write(f"Total Files Scanned:      {summary['total_files_scanned']}\n")
-                f.write(f"Hardlinked Files:         {summary['hardlinked_count']}\n")
-                f.write(f"Non-Hardlinked Files:     {summary['non_hardlinked_count']}\n")
-                f.write(f"Errors Encountered:       {summary['errors']}\n")
-                f.write(f"Total Size:               {summary['total_size']}\n")
-                f.write(f"Non-Hardlinked Size:      {summary['non_hardlinked_size']}\n")
-                f.write(f"Percentage Not Hardlinked: {summary['percentage_not_hardlinked']}%\n")
-                f.write("\n")
-
-                # Write detailed file list
-                if non_hardlinked_files:
-                    f.write("=" * 80 + "\n")
-                    f.write("NON-HARDLINKED FILES\n")
-                    f.write("=" * 80 + "\n\n")
-
-                    for i, file_info in enumerate(non_hardlinked_files, 1):
-                        f.write(f"[{i}] {file_info['path']}\n")
-                        f.write(f"    Size:         {file_info['size_human']} ({file_info['size_bytes']} bytes)\n")
-                        f.write(f"    Link Count:   {file_info['link_count']}\n")
-                        f.write(f"    Inode:        {file_info['inode']}\n")
-                        f.write(f"    Modified:     {file_info['modified']}\n")
-                        f.write("\n")
-                else:
-                    f.write("=" * 80 + "\n")
-                    f.write("All files are properly hardlinked!\n")
-                    f.write("=" * 80 + "\n")
+            writer_class = REPORT_WRITERS[self.config.get("report_format", "text")]
+
+            with RecordSpool(self.output_path.parent) as spool:
+                summary = self.scan_directory(spool.add)
+
+                with open(self.output_path, 'w', buffering=REPORT_BUFFER_SIZE, encoding='utf-8') as f:
+                    report = writer_class(f, summary)
+                    get_file_details = self.get_file_details
+                    for file_path, stat_info in spool:
+                        report.write_file(get_file_details(file_path, stat_info))
+                    report.finish()
 
             logging.info(f"Report generated: {self.output_path}")
+            return summary
 
         except (OSError, PermissionError) as e:
             logging.error(f"Failed to write report: {e}")
@@ -287,11 +896,8 @@ def main():
         # Initialize checker
         checker = HardlinkChecker()
 
-        # Scan directory
-        non_hardlinked_files, summary = checker.scan_directory()
-
-        # Generate report
-        checker.generate_report(non_hardlinked_files, summary)
+        # Scan directory and generate report
+        summary = checker.generate_report()
 
         # Print summary to console
         print("\n" + "=" * 80)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Build script for the optional native directory scanner.
+
+The Hardlink Checker runs without it; when the compiled _walker module sits
+next to check_hardlinks.py it is used for directory scans automatically.
+
+Usage:
+    python3 setup.py build_ext --inplace
+
+Author: OlickQC
+License: MIT
+"""
+
+from setuptools import setup, Extension
+
+
+setup(
+    name="hardlink_checker_walker",
+    ext_modules=[
+        Extension(
+            "_walker",
+            sources=["_walker.c"],
+            extra_compile_args=["-O3", "-march=native"],
+        )
+    ],
+)